@@ -7,48 +7,123 @@ import os
 import datetime
 import plotly.express as px
 import time  # Import the time module
+import sys
+from dataclasses import dataclass
 
 USER_DATA_FILE = 'user_data.json'
 
+NS_PER_DAY = 86_400 * 10**9
+EPOCH_DATE = datetime.date(1970, 1, 1)
+
+# Optional trade keys: only written to JSON when set
+OPTIONAL_TRADE_KEYS = ('initial_score_contribution', 'score_change', 'initial_score_contribution_deduction')
+
+def parse_epoch_ns(value):
+    """Convert an ISO timestamp string to int64 epoch nanoseconds (None if missing or invalid)."""
+    if value is None:
+        return None
+    try:
+        return pd.Timestamp(value).value
+    except ValueError:
+        return None
+
+def format_epoch_ns(value):
+    """Convert int64 epoch nanoseconds back to the ISO string stored in user_data.json."""
+    return None if value is None else pd.Timestamp(value).isoformat()
+
+def epoch_day_to_date(day):
+    """Convert a day number (epoch nanoseconds // NS_PER_DAY) to a datetime.date."""
+    return EPOCH_DATE + datetime.timedelta(days=day)
+
+@dataclass(slots=True)
+class Trade:
+    """A single buy or sell trade.
+
+    Times are naive int64 epoch nanoseconds and time_diff is in nanoseconds, so
+    day comparisons are integer divisions rather than Timestamp.date() calls.
+    Tickers are interned. to_json()/from_json() round-trip the trade schema
+    used in user_data.json.
+    """
+    stock: str
+    type: str
+    shares: int
+    price: float
+    entry_time: int
+    date: int
+    exit_time: int = None
+    time_diff: int = None
+    beta: float = None
+    initial_price: float = None
+    initial_score_contribution: float = None
+    score_change: float = None
+    initial_score_contribution_deduction: float = None
+
+    def __post_init__(self):
+        self.stock = sys.intern(self.stock)
+
+    @property
+    def day(self):
+        """Day number of the trade date, comparable across trades."""
+        return self.date // NS_PER_DAY
+
+    @classmethod
+    def from_json(cls, data):
+        time_diff = data.get('time_diff')
+        if time_diff is not None:
+            try:
+                time_diff = pd.Timedelta(time_diff).value
+            except ValueError:
+                time_diff = None
+        return cls(
+            stock=data['stock'],
+            type=data['type'],
+            shares=data['shares'],
+            price=data['price'],
+            entry_time=parse_epoch_ns(data.get('entry_time')),
+            date=parse_epoch_ns(data.get('date')),
+            exit_time=parse_epoch_ns(data.get('exit_time')),
+            time_diff=time_diff,
+            beta=data.get('beta'),
+            initial_price=data.get('initial_price'),
+            initial_score_contribution=data.get('initial_score_contribution'),
+            score_change=data.get('score_change'),
+            initial_score_contribution_deduction=data.get('initial_score_contribution_deduction')
+        )
+
+    def to_json(self):
+        data = {
+            "stock": self.stock,
+            "type": self.type,
+            "shares": self.shares,
+            "price": self.price
+        }
+        if self.type == 'Buy' or self.beta is not None: # Buy trades always carry beta, even if unknown
+            data["beta"] = self.beta
+        data["entry_time"] = format_epoch_ns(self.entry_time)
+        data["exit_time"] = format_epoch_ns(self.exit_time)
+        data["time_diff"] = None if self.time_diff is None else str(pd.Timedelta(self.time_diff))
+        data["date"] = format_epoch_ns(self.date)
+        data["initial_price"] = self.initial_price
+        for key in OPTIONAL_TRADE_KEYS:
+            value = getattr(self, key)
+            if value is not None:
+                data[key] = value
+        return data
+
+@dataclass
+class TradeResult:
+    """Outcome of a trade, independent of how (or whether) it is shown to the user."""
+    success: bool
+    message: str
+    trade: Trade = None
+
 def serialize_trade(trade):
     """Convert trade data to a JSON serializable format."""
-    serialized_trade = trade.copy()
-    
-    # Convert specific datetime objects and handle None values
-    for key, value in serialized_trade.items():
-        print(f"Serializing - Key: {key}, Value: {value}, Type: {type(value)}") # Debug print
-        if isinstance(value, datetime.datetime):  # Check for datetime objects
-            serialized_trade[key] = value.isoformat()
-        elif isinstance(value, pd.Timedelta):  # Check for Timedelta objects
-            serialized_trade[key] = str(value)  # Convert Timedelta to string
-            print(f"Serialized Timedelta - Key: {key}, Value: {serialized_trade[key]}, Type: {type(serialized_trade[key])}") # Debug print
-        elif value is None:
-            serialized_trade[key] = None
-            
-    return serialized_trade
+    return trade.to_json()
 
 def deserialize_trade(serialized_trade):
     """Convert serialized trade data back into a trade object."""
-    deserialized_trade = serialized_trade.copy()
-    
-    for key, value in deserialized_trade.items():
-        print(f"Deserializing - Key: {key}, Value: {value}, Type: {type(value)}") # Debug print
-        if isinstance(value, str) and key in ['date', 'entry_time', 'exit_time']:
-            try:
-                deserialized_trade[key] = pd.to_datetime(value)
-            except ValueError:
-                deserialized_trade[key] = None
-        elif key == 'time_diff' and isinstance(value, str):
-            deserialized_trade[key] = value # Keep time_diff as string
-            print(f"Deserialized time_diff - Key: {key}, Value: {deserialized_trade[key]}, Type: {type(deserialized_trade[key])}") # Debug print
-        elif value is None:
-            deserialized_trade[key] = None
-            
-    # Ensure initial_price exists
-    if 'initial_price' not in deserialized_trade:
-        deserialized_trade['initial_price'] = None
-        
-    return deserialized_trade
+    return Trade.from_json(serialized_trade)
 
 def save_user_data():
     """Save user data to file with error handling"""
@@ -162,15 +237,15 @@ def get_stock_price_and_beta(stock_name):
                 return None, None
 
 # Basic scoring functions - these need to be defined before they're used
-def calculate_portfolio_score(player):
+def calculate_portfolio_score(player, price_lookup=get_stock_price_and_beta):
     """Calculate portfolio score based on percentage change weighted by initial stock price."""
     total_score = 0
     for trade in player['trades']:
-        if trade['type'] == 'Buy':
-            current_price, _ = get_stock_price_and_beta(trade['stock'])
-            if current_price is not None and trade['initial_price'] != 0:  # Avoid division by zero
-                percentage_change = ((current_price - trade['initial_price']) / trade['initial_price']) * 100
-                score_contribution = percentage_change * trade['initial_price'] # Weight by initial price
+        if trade.type == 'Buy':
+            current_price, _ = price_lookup(trade.stock)
+            if current_price is not None and trade.initial_price != 0:  # Avoid division by zero
+                percentage_change = ((current_price - trade.initial_price) / trade.initial_price) * 100
+                score_contribution = percentage_change * trade.initial_price # Weight by initial price
                 total_score += score_contribution
 
     return total_score
@@ -194,14 +269,14 @@ def calculate_overtrading_penalty(player):
 import pandas as pd
 
 def calculate_overtrading_penalty(player):
-    today_date = pd.Timestamp.now().date()
-    today_trades = [trade for trade in player['trades'] if trade['date'].date() == today_date]
+    today = pd.Timestamp.now().value // NS_PER_DAY
+    today_trades = [trade for trade in player['trades'] if trade.day == today]
     num_today_trades = len(today_trades)
     print(f"calculate_overtrading_penalty - START - Number of trades today: {num_today_trades}") # Debug print
 
     if num_today_trades >= 20:
         penalty_percentage = 0.10
-        initial_scores_sum_today = sum(trade.get("initial_score_contribution", 0) for trade in today_trades)
+        initial_scores_sum_today = sum(trade.initial_score_contribution or 0 for trade in today_trades)
         penalty_amount = initial_scores_sum_today * penalty_percentage
         print(f"calculate_overtrading_penalty - Overtrading penalty applied: {penalty_amount}") # Debug print
         return penalty_amount
@@ -210,31 +285,34 @@ def calculate_overtrading_penalty(player):
         return 0
 
 def calculate_reckless_investing_penalty(player):
-    large_trades = [trade for trade in player['trades'] if trade['shares'] * trade['price'] > 50000]
+    large_trades = [trade for trade in player['trades'] if trade.shares * trade.price > 50000]
     return min(len(large_trades), 2) * 3
 
 def calculate_diversification_bonus(player):
-    return 5 if len(set(trade['stock'] for trade in player['trades'])) >= 5 else 0
+    return 5 if len(set(trade.stock for trade in player['trades'])) >= 5 else 0
 
 def get_day_trades(player):
+    """Map day number -> {stock: number of same-day buys} for every sell with a same-day buy."""
+    # Count buy trades per (stock, day) once instead of rescanning for every sell
+    buy_counts = {}
+    for trade in player['trades']:
+        if trade.type == "Buy":
+            key = (trade.stock, trade.day)
+            buy_counts[key] = buy_counts.get(key, 0) + 1
+
     day_trades = {}
     for trade in player['trades']:
-        if trade['type'] == "Sell":
-            date = trade['date'].date()
-            stock = trade['stock']
-
-            # Find buy trades for the same stock on the same day
-            buy_trades = [t for t in player['trades']
-                         if t['stock'] == stock
-                         and t['type'] == "Buy"
-                         and t['date'].date() == date]
-
-            if buy_trades:
-                if date not in day_trades:
-                    day_trades[date] = {}
-                if stock not in day_trades[date]:
-                    day_trades[date][stock] = 0
-                day_trades[date][stock] += len(buy_trades)
+        if trade.type == "Sell":
+            day = trade.day
+            stock = trade.stock
+            buy_count = buy_counts.get((stock, day), 0)
+
+            if buy_count:
+                if day not in day_trades:
+                    day_trades[day] = {}
+                if stock not in day_trades[day]:
+                    day_trades[day][stock] = 0
+                day_trades[day][stock] += buy_count
 
     return day_trades
 
@@ -246,43 +324,52 @@ def calculate_day_trading_penalty(player):
         print("calculate_day_trading_penalty - No day trades found, penalty is 0")
         return 0
 
-    for date, stocks in day_trades.items():
-        print(f"calculate_day_trading_penalty - Date: {date}, Type: {type(date)}, Stocks: {stocks}")
+    for day, stocks in day_trades.items():
+        print(f"calculate_day_trading_penalty - Date: {epoch_day_to_date(day)}, Stocks: {stocks}")
         for stock, trade_count in stocks.items():
             sell_trade = next((t for t in player['trades']
-                               if t['stock'] == stock
-                               and t['type'] == 'Sell'
-                               and t['date'].date() == date), None)
+                               if t.stock == stock
+                               and t.type == 'Sell'
+                               and t.day == day), None)
             print(f"calculate_day_trading_penalty - Sell Trade: {sell_trade}, Type: {type(sell_trade)}")
             if sell_trade:
-                print(f"calculate_day_trading_penalty - Sell Trade Date: {sell_trade['date']}, Type: {type(sell_trade['date'])}")
-                print(f"calculate_day_trading_penalty - Date from day_trades: {date}, Type: {type(date)}")
-                penalty_per_share = sell_trade['price'] * 0.30
+                penalty_per_share = sell_trade.price * 0.30
                 penalty_for_stock = penalty_per_share * trade_count
                 print(f"calculate_day_trading_penalty - Stock: {stock}, Trade Count: {trade_count}, Penalty per share: {penalty_per_share}, Penalty for stock: {penalty_for_stock}")
                 total_penalty += penalty_for_stock
     print(f"calculate_day_trading_penalty - Total Day Trading Penalty: {total_penalty}")
     return total_penalty
 
-def calculate_market_performance_bonus(player):
+def get_market_change_percentage():
+    """Return today's S&P 500 open-to-close change in percent, or None if unavailable."""
     try:
-        portfolio_change_percentage = calculate_portfolio_score(player)
         market_data = yf.Ticker("^GSPC").history(period='1d')
         if not market_data.empty:
             sp500_price = market_data['Close'].iloc[-1]
             sp500_prev_price = market_data['Open'].iloc[0]
-            market_change_percentage = ((sp500_price - sp500_prev_price) / sp500_prev_price) * 100
+            return ((sp500_price - sp500_prev_price) / sp500_prev_price) * 100
+    except:
+        pass
+    return None
+
+def calculate_market_performance_bonus(player, price_lookup=get_stock_price_and_beta,
+                                       market_lookup=get_market_change_percentage):
+    try:
+        portfolio_change_percentage = calculate_portfolio_score(player, price_lookup)
+        market_change_percentage = market_lookup()
+        if market_change_percentage is not None:
             return 10 if portfolio_change_percentage > market_change_percentage else -5
     except:
         pass
     return 0
 
-def apply_penalties(player):
+def apply_penalties(player, price_lookup=get_stock_price_and_beta,
+                    market_lookup=get_market_change_percentage):
     print(f"apply_penalties - START - Number of trades: {len(player['trades'])}")
-    score = calculate_portfolio_score(player)
+    score = calculate_portfolio_score(player, price_lookup)
     print(f"apply_penalties - Initial Score (portfolio score): {score}")
 
-    initial_score_bonus = sum(trade.get("initial_score_contribution", 0) for trade in player['trades'])
+    initial_score_bonus = sum(trade.initial_score_contribution or 0 for trade in player['trades'])
     score += initial_score_bonus
     print(f"apply_penalties - Score after initial bonus: {score}")
 
@@ -308,19 +395,19 @@ def apply_penalties(player):
     score += diversification_bonus
     print(f"apply_penalties - Score after diversification bonus: {score}")
 
-    market_performance_bonus = calculate_market_performance_bonus(player)
+    market_performance_bonus = calculate_market_performance_bonus(player, price_lookup, market_lookup)
     print(f"apply_penalties - Market Performance Bonus: {market_performance_bonus}")
     score += market_performance_bonus
     print(f"apply_penalties - Score after market performance bonus: {score}")
 
     for trade in player['trades']:
-        if trade['type'] == 'Buy' and trade['beta'] is not None:
-            if trade['beta'] >= 2:
+        if trade.type == 'Buy' and trade.beta is not None:
+            if trade.beta >= 2:
                 score -= 2
-                print(f"apply_penalties - High Beta Penalty for {trade['stock']}: -2")
+                print(f"apply_penalties - High Beta Penalty for {trade.stock}: -2")
             else:
                 score += 3
-                print(f"apply_penalties - Low Beta Bonus for {trade['stock']}: +3")
+                print(f"apply_penalties - Low Beta Bonus for {trade.stock}: +3")
 
     print(f"apply_penalties - Score before final adjustment: {score}")
     final_score = max(0, score) # Ensure score is not negative
@@ -330,26 +417,27 @@ def apply_penalties(player):
     return final_score
 
 # Function to process a sell trade
-def process_sell_trade(player, stock_name, shares, entry_time, stock_price):
-    available_shares = sum(t['shares'] for t in player['trades']
-                         if t['stock'] == stock_name and t['type'] == 'Buy' and t['exit_time'] is None)
+def process_sell_trade(player, stock_name, shares, entry_time, stock_price,
+                       price_lookup=get_stock_price_and_beta,
+                       market_lookup=get_market_change_percentage):
+    available_shares = sum(t.shares for t in player['trades']
+                         if t.stock == stock_name and t.type == 'Buy' and t.exit_time is None)
 
     if shares > available_shares:
-        st.error(f"You only have {available_shares} shares available to sell")
-        return
+        return TradeResult(False, f"You only have {available_shares} shares available to sell")
 
     trade_amount = shares * stock_price
     shares_to_sell = shares
     initial_score_contribution_deduction = 0
 
     for t in player['trades']:
-        if (t['stock'] == stock_name and t['type'] == 'Buy' and
-            t['exit_time'] is None and shares_to_sell > 0):
-            shares_sold = min(shares_to_sell, t['shares'])
-            t['exit_time'] = entry_time
-            t['time_diff'] = entry_time - t['entry_time']
+        if (t.stock == stock_name and t.type == 'Buy' and
+            t.exit_time is None and shares_to_sell > 0):
+            shares_sold = min(shares_to_sell, t.shares)
+            t.exit_time = entry_time
+            t.time_diff = entry_time - t.entry_time
             shares_to_sell -= shares_sold
-            initial_score_contribution_deduction += t.get('initial_score_contribution', 0) * (shares_sold / t['shares']) # Deduct proportionally
+            initial_score_contribution_deduction += (t.initial_score_contribution or 0) * (shares_sold / t.shares) # Deduct proportionally
 
     player['portfolio_value'] += trade_amount
 
@@ -358,79 +446,86 @@ def process_sell_trade(player, stock_name, shares, entry_time, stock_price):
     score_change = -initial_score_contribution_deduction
 
     print(f"process_sell_trade - Score before potential deduction: {player['score']}", flush=True) # Debug print - forced flush
-    st.write(f"Debug - process_sell_trade - Score before potential deduction: {player['score']}") # Streamlit debug output
     print(f"process_sell_trade - initial_score_contribution_deduction: {initial_score_contribution_deduction}", flush=True) # Debug print - forced flush
-    st.write(f"Debug - process_sell_trade - initial_score_contribution_deduction: {initial_score_contribution_deduction}") # Streamlit debug output
     print(f"process_sell_trade - score_change: {score_change}", flush=True) # Debug print - forced flush
-    st.write(f"Debug - process_sell_trade - score_change: {score_change}") # Streamlit debug output
     print(f"process_sell_trade - Before apply_penalties call, current score: {player['score']}", flush=True) # Debug print - forced flush
-    st.write(f"Debug - process_sell_trade - Before apply_penalties call, current score: {player['score']}") # Streamlit debug output
-    player['score'] = apply_penalties(player) # Recalculate score after sell
+    player['score'] = apply_penalties(player, price_lookup, market_lookup) # Recalculate score after sell
     print(f"process_sell_trade - Score after recalculating penalties: {player['score']}", flush=True) # Debug print - forced flush
-    st.write(f"Debug - process_sell_trade - Score after recalculating penalties: {player['score']}") # Streamlit debug output
 
     # Add sell trade to history
-    trade = {
-        "stock": stock_name,
-        "type": "Sell",
-        "shares": shares,
-        "price": stock_price,
-        "entry_time": entry_time,
-        "exit_time": None,
-        "time_diff": None,
-        "date": entry_time,
-        "initial_score_contribution_deduction": initial_score_contribution_deduction, # Record deduction for audit
-        "score_change": score_change # Record score change for sell
-    }
-    print(f"process_sell_trade - BEFORE APPEND - trade['score_change']: {trade['score_change']}") # Debug print
-    st.write(f"Debug - process_sell_trade - BEFORE APPEND - trade['score_change']: {trade['score_change']}") # Streamlit debug output
+    trade = Trade(
+        stock=stock_name,
+        type="Sell",
+        shares=shares,
+        price=stock_price,
+        entry_time=entry_time,
+        date=entry_time,
+        initial_score_contribution_deduction=initial_score_contribution_deduction, # Record deduction for audit
+        score_change=score_change # Record score change for sell
+    )
+    print(f"process_sell_trade - BEFORE APPEND - trade.score_change: {trade.score_change}") # Debug print
     player['trades'].append(trade)
 
-    st.success(f"Sell order recorded: {shares} shares of {stock_name} at ${stock_price:.2f}. Score deduction: {initial_score_contribution_deduction:.2f}, Score Change: {score_change:.2f}")
+    return TradeResult(True, f"Sell order recorded: {shares} shares of {stock_name} at ${stock_price:.2f}. Score deduction: {initial_score_contribution_deduction:.2f}, Score Change: {score_change:.2f}", trade)
 
 # Function to execute a trade
-def execute_trade(player, stock_name, trade_type, shares):
-    stock_price, beta = get_stock_price_and_beta(stock_name)
+def execute_trade(player, stock_name, trade_type, shares,
+                  price_lookup=get_stock_price_and_beta,
+                  market_lookup=get_market_change_percentage):
+    """Execute a trade for player and return a TradeResult.
+
+    Nothing is written to the Streamlit page here, so the same path can be
+    driven headlessly (see replay.py); the UI reports the result through
+    show_trade_result().
+    """
+    stock_price, beta = price_lookup(stock_name)
     if stock_price is None:
-        st.error("Could not fetch stock data. Please check the ticker symbol.")
-        return
+        return TradeResult(False, "Could not fetch stock data. Please check the ticker symbol.")
 
     trade_amount = shares * stock_price
-    entry_time = pd.Timestamp.now()
+    entry_time = pd.Timestamp.now().value
 
     if trade_type == "Buy":
         if trade_amount > player['portfolio_value']:
-            st.error("Insufficient funds for this trade!")
-            return
-
-        trade = {
-            "stock": stock_name,
-            "type": trade_type,
-            "shares": shares,
-            "price": stock_price,
-            "beta": beta, # Store beta value
-            "entry_time": entry_time,
-            "exit_time": None,
-            "time_diff": None,
-            "date": entry_time,
-            "initial_price": stock_price, # Store initial price
-            "initial_score_contribution": 0 # Initialize initial score contribution
-        }
+            return TradeResult(False, "Insufficient funds for this trade!")
+
+        trade = Trade(
+            stock=stock_name,
+            type=trade_type,
+            shares=shares,
+            price=stock_price,
+            entry_time=entry_time,
+            date=entry_time,
+            beta=beta, # Store beta value
+            initial_price=stock_price, # Store initial price
+            initial_score_contribution=0 # Initialize initial score contribution
+        )
 
         # Calculate initial score contribution based on stock price and beta
         if beta is not None and beta >= 2:
             initial_score_contribution = stock_price * (1 - (beta / 2.5)) # Increased penalty for high beta
         else:
             initial_score_contribution = stock_price * (1 - (beta if beta is not None else 1)/5)
-        trade["initial_score_contribution"] = initial_score_contribution
-        trade["score_change"] = initial_score_contribution
+        trade.initial_score_contribution = initial_score_contribution
+        trade.score_change = initial_score_contribution
         player['trades'].append(trade)
         player['portfolio_value'] -= trade_amount
-        st.success(f"Buy order recorded: {shares} shares of {stock_name} at ${stock_price:.2f}. Initial score contribution: {initial_score_contribution:.2f}")
+        return TradeResult(True, f"Buy order recorded: {shares} shares of {stock_name} at ${stock_price:.2f}. Initial score contribution: {initial_score_contribution:.2f}", trade)
 
     elif trade_type == "Sell":
-        process_sell_trade(player, stock_name, shares, entry_time, stock_price)
+        result = process_sell_trade(player, stock_name, shares, entry_time, stock_price,
+                                    price_lookup, market_lookup)
         print(f"Number of trades after sell trade execution: {len(player['trades'])}")  # Debug print after sell trade
+        return result
+
+    return TradeResult(False, f"Unknown trade type: {trade_type}")
+
+def show_trade_result(result):
+    """Report a TradeResult on the Streamlit page."""
+    if result.success:
+        st.success(result.message)
+    else:
+        st.error(result.message)
 
 # Function to display the player's portfolio
 def display_portfolio(player):
@@ -445,8 +540,8 @@ def display_portfolio(player):
     if day_trades:
         st.subheader("⚠️ Day Trading Activity")
         st.write("Same-day buy and sell transactions:")
-        for date, stocks in day_trades.items():
-            st.write(f"Date: {date}")
+        for day, stocks in day_trades.items():
+            st.write(f"Date: {epoch_day_to_date(day)}")
             for stock, trades in stocks.items():
                 st.write(f"- {stock}: {trades} trades")
 
@@ -469,7 +564,7 @@ def display_portfolio(player):
 
     if player['trades']:
         st.subheader("Trade History")
-        trades_df = pd.DataFrame(player['trades'])
+        trades_df = pd.DataFrame([serialize_trade(trade) for trade in player['trades']])
         trades_df['time_diff'] = trades_df['time_diff'].astype(str)
         trades_df['score_change'] = trades_df['score_change'].fillna(0) # Ensure NaN values are 0 for display
         trades_df['Cumulative Score Change'] = trades_df['score_change'].cumsum()
@@ -477,16 +572,16 @@ def display_portfolio(player):
         st.dataframe(trades_df)
 
 # Display leaderboard function
-def calculate_total_portfolio_value(player):
+def calculate_total_portfolio_value(player, price_lookup=get_stock_price_and_beta):
     """Calculates the total portfolio value including cash and stock holdings."""
     portfolio_value = player['portfolio_value'] # Start with cash
     print(f"calculate_total_portfolio_value - Initial cash: {portfolio_value}")
     for trade in player['trades']:
-        if trade['type'] == 'Buy' and trade['exit_time'] is None: # Consider only currently held stocks
-            current_price, _ = get_stock_price_and_beta(trade['stock'])
-            print(f"calculate_total_portfolio_value - Stock: {trade['stock']}, Shares: {trade['shares']}, Current Price: {current_price}")
+        if trade.type == 'Buy' and trade.exit_time is None: # Consider only currently held stocks
+            current_price, _ = price_lookup(trade.stock)
+            print(f"calculate_total_portfolio_value - Stock: {trade.stock}, Shares: {trade.shares}, Current Price: {current_price}")
             if current_price is not None:
-                portfolio_value += trade['shares'] * current_price # Add current value of stocks
+                portfolio_value += trade.shares * current_price # Add current value of stocks
     print(f"calculate_total_portfolio_value - Final portfolio value: {portfolio_value}")
     return portfolio_value
 
@@ -549,19 +644,19 @@ def display_stock_spread(player):
 
     # Identify stocks that have been sold
     for trade in player['trades']:
-        if trade['type'] == 'Sell':
-            sold_stocks.add(trade['stock'])
+        if trade.type == 'Sell':
+            sold_stocks.add(trade.stock)
 
     # Filter out buy trades for stocks that have been sold
     for trade in player['trades']:
-        if trade['type'] == 'Buy' and trade['stock'] not in sold_stocks:
+        if trade.type == 'Buy' and trade.stock not in sold_stocks:
             open_buy_trades.append(trade)
 
     # Calculate stock counts for open buy trades
     for trade in open_buy_trades:
-        if trade['stock'] not in stock_counts:
-            stock_counts[trade['stock']] = 0
-        stock_counts[trade['stock']] += trade['shares']
+        if trade.stock not in stock_counts:
+            stock_counts[trade.stock] = 0
+        stock_counts[trade.stock] += trade.shares
 
     if not stock_counts:
         st.write("No open stock holdings to display.")
@@ -611,7 +706,7 @@ def main():
                         st.success(f"Account created successfully! Welcome, {name}!")
                         # Prefetch stock data after account creation
                         user_trades = st.session_state.user_data[email]['trades']
-                        stock_list = list(set([trade['stock'] for trade in user_trades])) if user_trades else []
+                        stock_list = list(set([trade.stock for trade in user_trades])) if user_trades else []
                         prefetch_stock_data(stock_list)
                         st.rerun()
                 else:
@@ -631,7 +726,7 @@ def main():
                         st.success(f"Welcome back, {st.session_state.user_data[email]['name']}!")
                         # Prefetch stock data after login
                         user_trades = st.session_state.user_data[email]['trades']
-                        stock_list = list(set([trade['stock'] for trade in user_trades])) if user_trades else []
+                        stock_list = list(set([trade.stock for trade in user_trades])) if user_trades else []
                         prefetch_stock_data(stock_list)
                         st.rerun()
                     else:
@@ -656,7 +751,7 @@ def main():
         display_stock_history(stock_name)
 
         if st.button("Submit Trade") and stock_name:
-            execute_trade(player, stock_name, trade_type, shares)
+            show_trade_result(execute_trade(player, stock_name, trade_type, shares))
             save_user_data()  # Save after each trade
             st.rerun() # Rerun to update chart immediately
 
@@ -0,0 +1,164 @@
+"""Replay a stream of trade requests headlessly against app.execute_trade.
+
+Each line of the input JSONL file is one trade request:
+
+    {"player": "lukamagic", "stock": "TSLA", "type": "Buy", "shares": 1}
+
+Prices come from an offline fixture instead of Yahoo Finance:
+
+    {"market_change": 0.4, "stocks": {"TSLA": {"price": 361.62, "beta": 2.295}}}
+
+The stream is replayed once serially and once on a thread pool (trades for
+the same player are serialised by a per-player lock, but may run out of
+order). The harness prints trades/sec, p50/p99 latency and how far the
+concurrent final scores drift from the serial ones. Latency covers the
+execute_trade call only; time spent waiting for the player's lock is not
+counted, so serial and concurrent latencies are comparable.
+
+Usage:
+    python replay.py trades.jsonl --prices prices.json --workers 8
+"""
+import argparse
+import contextlib
+import json
+import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from app import apply_penalties, execute_trade
+
+
+def load_trade_requests(path):
+    """Read trade requests from a JSONL file, skipping blank lines."""
+    trade_requests = []
+    with open(path, 'r') as file:
+        for line in file:
+            line = line.strip()
+            if line:
+                trade_requests.append(json.loads(line))
+    return trade_requests
+
+
+def load_price_fixture(path):
+    """Build price and market lookups from a JSON price fixture."""
+    with open(path, 'r') as file:
+        fixture = json.load(file)
+    stocks = fixture.get('stocks', {})
+    market_change = fixture.get('market_change')
+
+    def price_lookup(stock_name):
+        quote = stocks.get(stock_name)
+        if quote is None:
+            return None, None
+        return quote.get('price'), quote.get('beta')
+
+    def market_lookup():
+        return market_change
+
+    return price_lookup, market_lookup
+
+
+def new_player(name):
+    return {
+        'name': name,
+        'trades': [],
+        'portfolio_value': 100000,
+        'score': 0
+    }
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(len(sorted_values) * pct / 100))
+    return sorted_values[rank - 1]
+
+
+def replay(trade_requests, price_lookup, market_lookup, workers):
+    """Run every trade request and return (players, latencies, elapsed, failures).
+
+    workers=1 runs the stream serially in file order on the calling thread.
+    """
+    players = {}
+    locks = {}
+    for request in trade_requests:
+        name = request['player']
+        if name not in players:
+            players[name] = new_player(name)
+            locks[name] = threading.Lock()
+
+    latencies = [0.0] * len(trade_requests)
+    failures = [0]
+    failures_lock = threading.Lock()
+
+    def run(index):
+        request = trade_requests[index]
+        with locks[request['player']]:
+            start = time.perf_counter()
+            result = execute_trade(players[request['player']], request['stock'],
+                                   request['type'], request['shares'],
+                                   price_lookup, market_lookup)
+            latencies[index] = time.perf_counter() - start
+        if not result.success:
+            with failures_lock:
+                failures[0] += 1
+
+    start = time.perf_counter()
+    if workers == 1:
+        for index in range(len(trade_requests)):
+            run(index)
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(run, range(len(trade_requests))))
+    elapsed = time.perf_counter() - start
+
+    for player in players.values():
+        player['score'] = apply_penalties(player, price_lookup, market_lookup)
+    return players, latencies, elapsed, failures[0]
+
+
+def format_report(label, trade_count, latencies, elapsed, failures):
+    latencies = sorted(latencies)
+    trades_per_sec = trade_count / elapsed if elapsed > 0 else float('inf')
+    return (f"{label}: {trade_count} trades in {elapsed:.3f}s "
+            f"({trades_per_sec:,.0f} trades/sec), "
+            f"p50 {percentile(latencies, 50) * 1000:.3f} ms, "
+            f"p99 {percentile(latencies, 99) * 1000:.3f} ms, "
+            f"{failures} rejected")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay trade requests against execute_trade.")
+    parser.add_argument('trades', help="JSONL file of trade requests")
+    parser.add_argument('--prices', required=True, help="JSON price fixture")
+    parser.add_argument('--workers', type=int, default=8, help="Threads for the concurrent run")
+    args = parser.parse_args()
+
+    trade_requests = load_trade_requests(args.trades)
+    price_lookup, market_lookup = load_price_fixture(args.prices)
+
+    # The trading path prints a lot of debug output; keep it out of the timings.
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        serial = replay(trade_requests, price_lookup, market_lookup, 1)
+        concurrent = replay(trade_requests, price_lookup, market_lookup, args.workers)
+
+    serial_players = serial[0]
+    concurrent_players = concurrent[0]
+    print(format_report("serial", len(trade_requests), *serial[1:]))
+    print(format_report(f"concurrent ({args.workers} workers)", len(trade_requests), *concurrent[1:]))
+
+    score_diffs = {name: concurrent_players[name]['score'] - serial_players[name]['score']
+                   for name in serial_players}
+    drifted = {name: diff for name, diff in score_diffs.items() if diff != 0}
+    print(f"final score diff vs serial: {len(drifted)} of {len(score_diffs)} players differ, "
+          f"total {sum(score_diffs.values()):+.2f}")
+    for name, diff in sorted(drifted.items(), key=lambda item: -abs(item[1])):
+        print(f"  {name}: {serial_players[name]['score']:.2f} -> "
+              f"{concurrent_players[name]['score']:.2f} ({diff:+.2f})")
+
+
+if __name__ == "__main__":
+    main()